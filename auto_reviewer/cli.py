@@ -1,11 +1,12 @@
 """CLI interface for Auto Reviewer."""
 
+import asyncio
 import os
 import sys
 import typer
 from typing import Optional
 
-from auto_reviewer.core.config import load_config
+from auto_reviewer.core.config import load_config, YamlDumper
 from auto_reviewer.core.reviewer import CodeReviewer
 from auto_reviewer.core.git import GitHandler
 
@@ -16,7 +17,7 @@ def review(pr_number: int):
     """Review a specific pull request."""
     try:
         reviewer = CodeReviewer()
-        result = reviewer.review_pr(pr_number)
+        result = asyncio.run(reviewer.review_pr(pr_number))
         typer.echo(result)
     except Exception as e:
         typer.echo(f"Error reviewing PR {pr_number}: {str(e)}", err=True)
@@ -27,7 +28,7 @@ def review_local():
     """Review local changes."""
     try:
         reviewer = CodeReviewer()
-        result = reviewer.review_local_changes()
+        result = asyncio.run(reviewer.review_local_changes())
         typer.echo(result)
     except Exception as e:
         typer.echo(f"Error reviewing local changes: {str(e)}", err=True)
@@ -64,7 +65,7 @@ def init():
         
         with open(config_path, "w") as f:
             import yaml
-            yaml.dump(config, f)
+            yaml.dump(config, f, Dumper=YamlDumper)
         
         typer.echo("Auto Reviewer initialized successfully!")
         
@@ -1,19 +1,48 @@
 """Configuration handler for Auto Reviewer."""
 
+import copy
+import logging
 import os
 import yaml
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+    logger.warning("libyaml is not available; falling back to the pure-Python YAML parser")
+
+# Parsed configs keyed by absolute path, validated against (mtime_ns, size).
+_CONFIG_CACHE: "OrderedDict[str, Tuple[int, int, Dict[str, Any]]]" = OrderedDict()
+_CONFIG_CACHE_MAX = 100
 
 def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     """Load configuration from .autoreviewerrc file."""
     if not config_path:
         config_path = os.path.join(os.getcwd(), ".autoreviewerrc")
-    
-    if not os.path.exists(config_path):
+    config_path = os.path.abspath(config_path)
+
+    try:
+        st = os.stat(config_path)
+    except OSError:
         return get_default_config()
-    
+
+    entry = _CONFIG_CACHE.get(config_path)
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        _CONFIG_CACHE.move_to_end(config_path)
+        return copy.deepcopy(entry[2])
+
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
+
+    _CONFIG_CACHE[config_path] = (st.st_mtime_ns, st.st_size, copy.deepcopy(config))
+    _CONFIG_CACHE.move_to_end(config_path)
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+        _CONFIG_CACHE.popitem(last=False)
+    return config
 
 def get_default_config() -> Dict[str, Any]:
     """Get default configuration."""
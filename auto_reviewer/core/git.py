@@ -1,8 +1,38 @@
 """Git operations handler for Auto Reviewer."""
 
+import heapq
+import itertools
 import os
-from git import Repo
-from typing import List, Dict
+import subprocess
+from datetime import datetime, timedelta, timezone
+from git import Repo, InvalidGitRepositoryError
+from typing import List, Dict, Optional
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+_DIFF_HEADER = "diff --git "
+
+def _split_diff(diff: str) -> Dict[str, str]:
+    """Split a multi-file diff into per-file sections keyed by path.
+
+    Only unquoted headers whose a/ and b/ paths agree are indexed; anything
+    else (renames, quoted paths) is left for a per-file lookup.
+    """
+    sections = {}
+    if not diff:
+        return sections
+    for chunk in diff.split("\n" + _DIFF_HEADER):
+        if not chunk.startswith(_DIFF_HEADER):
+            chunk = _DIFF_HEADER + chunk
+        header = chunk.split("\n", 1)[0][len(_DIFF_HEADER):]
+        half = (len(header) - 1) // 2
+        a_path, b_path = header[:half], header[half + 1:]
+        if a_path.startswith("a/") and b_path == "b/" + a_path[2:]:
+            sections[a_path[2:]] = chunk
+    return sections
 
 class GitHandler:
     """Handler for Git operations."""
@@ -11,6 +41,11 @@ class GitHandler:
         """Initialize GitHandler with repository path."""
         self.repo_path = repo_path or os.getcwd()
         self._repo = None
+        self._pygit2_repo = None
+        self._probed = False
+        self._toplevel: Optional[str] = None
+        self._is_repo = False
+        self._branch: Optional[str] = None
 
     @property
     def repo(self) -> Repo:
@@ -19,40 +54,100 @@ class GitHandler:
             self._repo = Repo(self.repo_path)
         return self._repo
 
+    @property
+    def pygit2_repo(self) -> Optional["pygit2.Repository"]:
+        """Get the in-process libgit2 repository, if pygit2 is installed."""
+        if self._pygit2_repo is None and pygit2 is not None:
+            self._pygit2_repo = pygit2.Repository(self.repo_path)
+        return self._pygit2_repo
+
+    def _probe(self) -> None:
+        """Resolve repository root, work tree status and branch in one git call."""
+        if self._probed:
+            return
+        try:
+            # Output is line-per-flag; it is still emitted for an unborn HEAD,
+            # where only the branch lookup fails.
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel", "--is-inside-work-tree",
+                 "--abbrev-ref", "HEAD"],
+                cwd=self.repo_path, capture_output=True, text=True
+            )
+            lines = result.stdout.splitlines()
+        except OSError:
+            lines = []
+        self._toplevel = lines[0] if len(lines) > 0 else None
+        self._is_repo = len(lines) > 1 and lines[1] == "true"
+        self._branch = lines[2] if len(lines) > 2 else None
+        self._probed = True
+
+    def refresh(self) -> None:
+        """Drop cached repository state so it is re-read on next access."""
+        self._probed = False
+
     def is_git_repo(self) -> bool:
         """Check if current directory is a git repository."""
-        try:
-            _ = self.repo
-            return True
-        except:
-            return False
+        self._probe()
+        return self._is_repo
 
     def get_repo_root(self) -> str:
         """Get the root directory of the git repository."""
-        return self.repo.git.rev_parse("--show-toplevel")
+        self._probe()
+        if self._toplevel is None:
+            raise InvalidGitRepositoryError(self.repo_path)
+        return self._toplevel
 
     def get_current_branch(self) -> str:
         """Get the name of the current branch."""
-        return self.repo.active_branch.name
+        self._probe()
+        if self._branch is None or self._branch == "HEAD":
+            # Detached or unborn HEAD: let GitPython resolve or report it
+            return self.repo.active_branch.name
+        return self._branch
 
     def get_changed_files(self) -> List[str]:
         """Get list of files changed in the current working directory."""
+        if self.pygit2_repo is not None:
+            changed = (pygit2.GIT_STATUS_WT_MODIFIED | pygit2.GIT_STATUS_WT_DELETED |
+                       pygit2.GIT_STATUS_WT_TYPECHANGE | pygit2.GIT_STATUS_WT_RENAMED)
+            return sorted(path for path, flags in self.pygit2_repo.status().items()
+                          if flags & changed)
         return [item.a_path for item in self.repo.index.diff(None)]
 
     def get_diff_for_file(self, file_path: str) -> str:
         """Get the diff for a specific file."""
         return self.repo.git.diff(file_path)
 
+    def get_diffs(self, file_paths: List[str]) -> Dict[str, str]:
+        """Get the current diff of each file, keyed by path.
+
+        The working tree diff is taken once for the whole batch; files it
+        cannot be attributed to fall back to a direct diff.
+        """
+        sections = _split_diff(self.repo.git.diff())
+        return {
+            path: sections[path] if path in sections else self.get_diff_for_file(path)
+            for path in file_paths
+        }
+
     def get_file_content(self, file_path: str, ref: str = 'HEAD') -> str:
         """Get content of a file at a specific reference."""
         try:
-            return self.repo.git.show(f'{ref}:{file_path}')
+            if self.pygit2_repo is not None:
+                data = self.pygit2_repo.revparse_single(f'{ref}:{file_path}').data
+            else:
+                # Served by GitPython's persistent `git cat-file --batch` process
+                _, _, _, data = self.repo.git.get_object_data(f'{ref}:{file_path}')
+            return data.decode('utf-8')
         except:
             with open(file_path, 'r') as f:
                 return f.read()
 
     def get_commit_history(self, file_path: str, max_count: int = 10) -> List[Dict]:
         """Get commit history for a specific file."""
+        if self.pygit2_repo is not None:
+            return self._get_commit_history_pygit2(file_path, max_count)
+
         commits = []
         for commit in self.repo.iter_commits(paths=file_path, max_count=max_count):
             commits.append({
@@ -61,4 +156,48 @@ class GitHandler:
                 'message': commit.message,
                 'date': commit.committed_datetime.isoformat()
             })
-        return commits
\ No newline at end of file
+        return commits
+
+    def _get_commit_history_pygit2(self, file_path: str, max_count: int) -> List[Dict]:
+        """Walk history in-process, keeping commits that change file_path.
+
+        Follows git's default history simplification for `git log -- <path>`:
+        a commit whose file_path matches one of its parents (TREESAME) is
+        hidden and only that parent is followed; otherwise the commit is kept
+        and all of its parents are walked. Commits are visited newest first
+        by commit date, as rev-list does.
+        """
+        def entry_id(commit, path):
+            try:
+                return commit.tree[path].id
+            except KeyError:
+                return None
+
+        repo = self.pygit2_repo
+        head = repo[repo.head.target]
+        # Max-heap on commit time; the counter keeps equal times in push order
+        counter = itertools.count()
+        queue = [(-head.commit_time, next(counter), head)]
+        seen = {head.id}
+        commits = []
+        while queue and len(commits) < max_count:
+            _, _, commit = heapq.heappop(queue)
+            blob_id = entry_id(commit, file_path)
+            parents = commit.parents
+            treesame = next((parent for parent in parents
+                             if entry_id(parent, file_path) == blob_id), None)
+            if treesame is not None:
+                parents = [treesame]
+            elif blob_id is not None or parents:
+                tz = timezone(timedelta(minutes=commit.commit_time_offset))
+                commits.append({
+                    'hash': str(commit.id),
+                    'author': commit.author.name,
+                    'message': commit.message,
+                    'date': datetime.fromtimestamp(commit.commit_time, tz).isoformat()
+                })
+            for parent in parents:
+                if parent.id not in seen:
+                    seen.add(parent.id)
+                    heapq.heappush(queue, (-parent.commit_time, next(counter), parent))
+        return commits
@@ -1,42 +1,70 @@
 """Report generation utilities for code reviews."""
 
+import html
 import json
+from dataclasses import asdict, is_dataclass
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Set
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Output directories already created by this process
+_INIT_DIRS: Set[Path] = set()
+
 class ReportGenerator:
     """Generates formatted reports from code review results."""
 
     def __init__(self, output_dir: Optional[str] = None):
         """Initialize report generator."""
         self.output_dir = Path(output_dir) if output_dir else Path.cwd() / "reports"
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output_key = self.output_dir.absolute()
+        if output_key not in _INIT_DIRS:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            _INIT_DIRS.add(output_key)
 
-    def generate_report(self, review_results: Dict, format: str = "markdown") -> str:
-        """Generate a formatted report from review results."""
+    def generate_report(self, review_results: Dict, format: str = "markdown",
+                        timestamp: Optional[datetime] = None) -> str:
+        """Generate a formatted report from review results.
+
+        Pass the same ``timestamp`` to save_report to keep the header and the
+        filename in agreement; it defaults to the current time.
+        """
+        timestamp = timestamp or datetime.now()
         if format == "markdown":
-            return self._generate_markdown_report(review_results)
+            return self._generate_markdown_report(review_results, timestamp)
         elif format == "html":
-            return self._generate_html_report(review_results)
+            return self._generate_html_report(review_results, timestamp)
         elif format == "json":
             return self._generate_json_report(review_results)
         else:
             raise ValueError(f"Unsupported format: {format}")
 
-    def save_report(self, report: str, format: str = "markdown") -> Path:
+    def save_report(self, report: str, format: str = "markdown",
+                    timestamp: Optional[datetime] = None) -> Path:
         """Save the report to a file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"code_review_{timestamp}.{format}"
-        report_path = self.output_dir / filename
+        timestamp = timestamp or datetime.now()
+        report_path = self.output_dir / f"code_review_{timestamp:%Y%m%d_%H%M%S}.{format}"
         
-        report_path.write_text(report)
+        try:
+            report_path.write_text(report)
+        except FileNotFoundError:
+            # The directory was removed after this process first created it
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            report_path.write_text(report)
         return report_path
 
-    def _generate_markdown_report(self, results: Dict) -> str:
+    def _generate_markdown_report(self, results: Dict, timestamp: datetime) -> str:
         """Generate a markdown format report."""
+        return "\n".join(self._report_lines(results, timestamp))
+
+    def _report_lines(self, results: Dict, timestamp: datetime) -> List[str]:
+        """Build the markdown report as a list of lines."""
         report = ["# Code Review Report\n"]
-        report.append(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        report.append(f"Generated at: {timestamp:%Y-%m-%d %H:%M:%S}\n")
         
         # Overall summary
         report.append("## Summary\n")
@@ -62,7 +90,7 @@ class ReportGenerator:
                 if 'metrics' in file_review:
                     report.append("#### Metrics\n")
                     report.append("```")
-                    for key, value in file_review['metrics'].__dict__.items():
+                    for key, value in asdict(file_review['metrics']).items():
                         report.append(f"{key}: {value}")
                     report.append("```\n")
                 
@@ -80,20 +108,30 @@ class ReportGenerator:
                     if 'issues' in ai_review:
                         report.append("##### Issues\n")
                         for issue in ai_review['issues']:
-                            report.append(f"- {issue}\n")
+                            report.append(f"- {self._format_ai_item(issue)}\n")
                     
                     if 'suggestions' in ai_review:
                         report.append("##### Suggestions\n")
                         for suggestion in ai_review['suggestions']:
-                            report.append(f"- {suggestion}\n")
+                            report.append(f"- {self._format_ai_item(suggestion)}\n")
         
-        return "\n".join(report)
+        return report
+
+    def _format_ai_item(self, item) -> str:
+        """Format a structured AI issue or suggestion as a single entry."""
+        if not isinstance(item, dict):
+            return str(item)
+        text = item.get('message', '')
+        if item.get('severity'):
+            text = f"[{item['severity']}] Line {item.get('line') or 'N/A'}: {text}"
+        elif item.get('line'):
+            text = f"Line {item['line']}: {text}"
+        if item.get('suggestion'):
+            text += f"\n  Suggestion: {item['suggestion']}"
+        return text
 
-    def _generate_html_report(self, results: Dict) -> str:
+    def _generate_html_report(self, results: Dict, timestamp: datetime) -> str:
         """Generate an HTML format report."""
-        # Convert markdown to HTML
-        markdown_content = self._generate_markdown_report(results)
-        
         html_template = """
         <!DOCTYPE html>
         <html>
@@ -101,14 +139,14 @@ class ReportGenerator:
             <meta charset="UTF-8">
             <title>Code Review Report</title>
             <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; max-width: 1200px; margin: 0 auto; padding: 20px; }
-                h1 { color: #2c3e50; border-bottom: 2px solid #eee; }
-                h2 { color: #34495e; margin-top: 30px; }
-                h3 { color: #7f8c8d; }
-                .metrics { background: #f8f9fa; padding: 15px; border-radius: 5px; }
-                .issue { margin: 10px 0; padding: 10px; border-left: 4px solid #e74c3c; }
-                .suggestion { margin: 10px 0; padding: 10px; border-left: 4px solid #2ecc71; }
-                code { background: #f8f9fa; padding: 2px 5px; border-radius: 3px; }
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; max-width: 1200px; margin: 0 auto; padding: 20px; }}
+                h1 {{ color: #2c3e50; border-bottom: 2px solid #eee; }}
+                h2 {{ color: #34495e; margin-top: 30px; }}
+                h3 {{ color: #7f8c8d; }}
+                .metrics {{ background: #f8f9fa; padding: 15px; border-radius: 5px; }}
+                .issue {{ margin: 10px 0; padding: 10px; border-left: 4px solid #e74c3c; }}
+                .suggestion {{ margin: 10px 0; padding: 10px; border-left: 4px solid #2ecc71; }}
+                code {{ background: #f8f9fa; padding: 2px 5px; border-radius: 3px; }}
             </style>
         </head>
         <body>
@@ -117,9 +155,16 @@ class ReportGenerator:
         </html>
         """
         
-        # Basic markdown to HTML conversion
-        html_content = markdown_content.replace("\n\n", "<br><br>")
-        html_content = html_content.replace("```", "<code>")
+        # Basic markdown to HTML conversion, straight from the report lines
+        html_lines = []
+        in_code = False
+        for line in self._report_lines(results, timestamp):
+            if line.startswith("```"):
+                html_lines.append("</code>" if in_code else "<code>")
+                in_code = not in_code
+            else:
+                html_lines.append(html.escape(line).replace("\n", "<br>"))
+        html_content = "<br>\n".join(html_lines)
         
         return html_template.format(content=html_content)
 
@@ -127,8 +172,24 @@ class ReportGenerator:
         """Generate a JSON format report."""
         # Convert any non-serializable objects to strings
         def serialize(obj):
+            # Results with read-only payloads convert themselves; asdict
+            # cannot copy a mappingproxy
+            if hasattr(obj, 'to_dict'):
+                return obj.to_dict()
+            if isinstance(obj, Mapping):
+                return dict(obj)
+            if is_dataclass(obj):
+                return asdict(obj)
             if hasattr(obj, '__dict__'):
                 return obj.__dict__
             return str(obj)
         
+        if orjson is not None:
+            # orjson encodes dataclasses such as CodeMetrics natively, so
+            # serialize only sees the remaining unsupported objects, such as
+            # the read-only mappings inside a StaticAnalysisResult
+            return orjson.dumps(
+                results, default=serialize,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode()
         return json.dumps(results, default=serialize, indent=2)
\ No newline at end of file
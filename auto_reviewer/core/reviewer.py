@@ -1,28 +1,42 @@
 """Core code review functionality with advanced analysis capabilities."""
 
 import os
-import ast
+import asyncio
+import json
+import logging
+import multiprocessing
 import re
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Optional, Tuple, Set
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from pathlib import Path
 
-from openai import OpenAI
+import pathspec
+from openai import AsyncOpenAI
 from pydantic import BaseModel
 
 from auto_reviewer.core.git import GitHandler
 from auto_reviewer.core.config import load_config
+from auto_reviewer.core.static_analysis import StaticAnalyzer, calculate_loc_metrics
 
-@dataclass
+@dataclass(frozen=True)
 class CodeMetrics:
     """Code quality metrics."""
+    __slots__ = ('cyclomatic_complexity', 'maintainability_index', 'cognitive_complexity',
+                 'lines_of_code', 'comment_ratio')
     cyclomatic_complexity: int
     maintainability_index: float
     cognitive_complexity: int
     lines_of_code: int
     comment_ratio: float
 
+    def __reduce__(self):
+        # Returned from analysis worker processes; rebuild through __init__
+        # because frozen instances reject pickle's attribute restore
+        return (self.__class__, tuple(getattr(self, f.name) for f in fields(self)))
+
 class ReviewComment(BaseModel):
     """Model for code review comments."""
     line_number: int
@@ -33,6 +47,95 @@ class ReviewComment(BaseModel):
     confidence: float
     context: str
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on in-flight AI review requests, to stay within rate limits
+_MAX_CONCURRENT_AI_REVIEWS = 8
+
+# Points an AI-reported issue takes off a perfect review score of 100
+_SEVERITY_WEIGHTS = {"high": 15, "medium": 5, "low": 1}
+
+# Per-process analyzer, so its result cache is reused across files and calls
+_analyzer: Optional[StaticAnalyzer] = None
+
+def _get_analyzer() -> StaticAnalyzer:
+    """Get the StaticAnalyzer shared by every task in this process."""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = StaticAnalyzer()
+    return _analyzer
+
+def _init_analysis_worker() -> None:
+    """Build the shared StaticAnalyzer up front in a worker process."""
+    _get_analyzer()
+
+# Worker pool kept for the process lifetime, so each worker's analyzer cache
+# carries over from one review to the next
+_analysis_pool: Optional[ProcessPoolExecutor] = None
+_analysis_pool_lock = threading.Lock()
+
+def _get_analysis_pool() -> ProcessPoolExecutor:
+    """Get the process-wide analysis pool, starting it on first use.
+
+    Workers are started with forkserver (spawn where it is unavailable) rather
+    than fork: the pool is created while the event loop and HTTP client threads
+    are running, and forking a multithreaded process can deadlock.
+    """
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            method = 'forkserver' if 'forkserver' in methods else 'spawn'
+            _analysis_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_init_analysis_worker
+            )
+        return _analysis_pool
+
+def _discard_analysis_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next review starts a fresh one."""
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is pool:
+            _analysis_pool = None
+    pool.shutdown(wait=False)
+
+def analyze_file_static(file_path: str, content: str) -> Dict:
+    """Compute metrics and static analysis for one file.
+
+    Free of reviewer state so it can run in a worker process; the AI review
+    is merged in by the caller.
+    """
+    analyzer = _get_analyzer()
+    try:
+        result = analyzer.analyze_code(content)
+    except Exception as e:
+        result = None
+        static_analysis = {"error": str(e)}
+    else:
+        static_analysis = result.to_dict()
+
+    if result is None or result.complexity == -1:
+        metrics = CodeMetrics(
+            cyclomatic_complexity=-1,
+            maintainability_index=-1,
+            cognitive_complexity=-1,
+            lines_of_code=-1,
+            comment_ratio=-1
+        )
+    else:
+        loc, comment_ratio = calculate_loc_metrics(content)
+        metrics = CodeMetrics(
+            cyclomatic_complexity=result.complexity,
+            maintainability_index=result.maintainability,
+            cognitive_complexity=result.cognitive_complexity,
+            lines_of_code=loc,
+            comment_ratio=comment_ratio
+        )
+
+    return {"file": file_path, "metrics": metrics, "static_analysis": static_analysis}
+
 class CodeReviewer:
     """Advanced code reviewer with static analysis and AI integration."""
 
@@ -40,12 +143,13 @@ class CodeReviewer:
         """Initialize CodeReviewer with configuration."""
         self.config = load_config(config_path)
         self.git = GitHandler()
-        self.ai_client = OpenAI()
+        self.ai_client = AsyncOpenAI()
         self._setup_analysis_patterns()
+        self._setup_ignore_patterns()
 
     def _setup_analysis_patterns(self):
-        """Setup patterns for code analysis."""
-        self.patterns = {
+        """Setup patterns for code analysis, compiled once per reviewer."""
+        raw_patterns = {
             'security': [
                 r'exec\s*\(',
                 r'eval\s*\(',
@@ -64,6 +168,25 @@ class CodeReviewer:
                 r'print\s*\(',
             ]
         }
+        self.patterns = {
+            category: [re.compile(pattern) for pattern in patterns]
+            for category, patterns in raw_patterns.items()
+        }
+
+    def _setup_ignore_patterns(self):
+        """Compile ignore patterns once, with gitignore semantics."""
+        # Get patterns from config or use defaults
+        patterns = self.config.get('ignore_patterns', [
+            '*.md',
+            '*.json',
+            '*.yaml',
+            '*.lock',
+            '**/tests/*',
+            '**/migrations/*',
+            '**/node_modules/*'
+        ])
+
+        self._ignore_spec = pathspec.GitIgnoreSpec.from_lines(patterns)
 
     async def review_pr(self, pr_number: int) -> Dict:
         """Review a GitHub pull request with detailed analysis."""
@@ -93,39 +216,57 @@ class CodeReviewer:
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def review_local_changes(self) -> Dict:
+    async def review_local_changes(self) -> Dict:
         """Review local changes with comprehensive analysis."""
         try:
             changed_files = self.git.get_changed_files()
             if not changed_files:
                 return {"status": "success", "message": "No changes to review"}
 
+            # Drop ignored files before any git or AI work is spent on them
+            files = [f for f in changed_files if not self._should_ignore_file(f)]
+            skipped = len(changed_files) - len(files)
+            if skipped:
+                logger.info("Skipping %d ignored file(s)", skipped)
+            if not files:
+                return {"status": "success", "message": "No changes to review"}
+
+            # Git reads stay in this thread; GitPython's cat-file pipe is not thread-safe
+            diffs_by_file = self.git.get_diffs(files)
+            diffs = [diffs_by_file[f] for f in files]
+            contents = [self.git.get_file_content(f) for f in files]
+
+            # AI reviews are I/O-bound and run concurrently on the event loop
+            # while the CPU-bound analysis is spread across processes
+            semaphore = asyncio.Semaphore(_MAX_CONCURRENT_AI_REVIEWS)
+
+            async def bounded_ai_review(file_path: str, diff: str, content: str) -> Dict:
+                async with semaphore:
+                    return await self._get_ai_review(file_path, diff, content)
+
+            loop = asyncio.get_running_loop()
+            static_task = loop.run_in_executor(None, self._analyze_files_static, files, contents)
+            ai_reviews = await asyncio.gather(*(
+                bounded_ai_review(file_path, diff, content)
+                for file_path, diff, content in zip(files, diffs, contents)
+            ))
+            static_results = await static_task
+
             reviews = []
             metrics = []
-            
-            for file_path in changed_files:
-                if self._should_ignore_file(file_path):
-                    continue
-                
-                # Get file changes and context
-                diff = self.git.get_diff_for_file(file_path)
-                current_content = self.git.get_file_content(file_path)
-                
-                # Comprehensive analysis
-                file_metrics = self._calculate_metrics(current_content)
-                static_analysis = self._perform_static_analysis(current_content)
-                ai_review = self._get_ai_review(file_path, diff, current_content)
-                
+            for static, ai_review in zip(static_results, ai_reviews):
                 review = {
-                    "file": file_path,
-                    "metrics": file_metrics,
-                    "static_analysis": static_analysis,
+                    "file": static["file"],
+                    "metrics": static["metrics"],
+                    "static_analysis": static["static_analysis"],
                     "ai_review": ai_review,
-                    "suggestions": self._generate_suggestions(static_analysis, file_metrics)
+                    "suggestions": self._generate_suggestions(
+                        static["static_analysis"], static["metrics"]
+                    )
                 }
                 
                 reviews.append(review)
-                metrics.append(file_metrics)
+                metrics.append(static["metrics"])
 
             return {
                 "status": "success",
@@ -138,49 +279,28 @@ class CodeReviewer:
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def _calculate_metrics(self, content: str) -> CodeMetrics:
-        """Calculate code quality metrics."""
+    def _analyze_files_static(self, files: List[str], contents: List[str]) -> List[Dict]:
+        """Run analyze_file_static over files, in worker processes when worthwhile."""
+        if len(files) < 2:
+            return [analyze_file_static(f, c) for f, c in zip(files, contents)]
+
+        pool = _get_analysis_pool()
         try:
-            tree = ast.parse(content)
-            
-            # Calculate cyclomatic complexity
-            complexity = self._calculate_cyclomatic_complexity(tree)
-            
-            # Calculate maintainability index
-            maintainability = self._calculate_maintainability_index(content)
-            
-            # Calculate cognitive complexity
-            cognitive = self._calculate_cognitive_complexity(tree)
-            
-            # Calculate lines of code and comment ratio
-            loc, comment_ratio = self._calculate_loc_metrics(content)
-            
-            return CodeMetrics(
-                cyclomatic_complexity=complexity,
-                maintainability_index=maintainability,
-                cognitive_complexity=cognitive,
-                lines_of_code=loc,
-                comment_ratio=comment_ratio
-            )
-        
-        except Exception:
-            return CodeMetrics(
-                cyclomatic_complexity=-1,
-                maintainability_index=-1,
-                cognitive_complexity=-1,
-                lines_of_code=-1,
-                comment_ratio=-1
-            )
+            return list(pool.map(analyze_file_static, files, contents))
+        except BrokenProcessPool:
+            _discard_analysis_pool(pool)
+            raise
 
-    def _get_ai_review(self, file_path: str, diff: str, content: str) -> Dict:
+    async def _get_ai_review(self, file_path: str, diff: str, content: str) -> Dict:
         """Get AI-powered code review."""
         try:
             # Prepare context-aware prompt
             prompt = self._build_review_prompt(file_path, diff, content)
             
             # Get AI analysis
-            response = self.ai_client.chat.completions.create(
-                model="gpt-4",
+            response = await self.ai_client.chat.completions.create(
+                # JSON mode is not available on the original gpt-4 snapshots
+                model="gpt-4-turbo",
                 messages=[
                     {
                         "role": "system",
@@ -191,10 +311,17 @@ class CodeReviewer:
                         3. Performance optimizations
                         4. Design pattern improvements
                         5. Testing suggestions
-                        Provide specific, actionable feedback with code examples where relevant."""
+                        Provide specific, actionable feedback with code examples where relevant.
+                        Respond with a single JSON object of the form:
+                        {"issues": [{"line": <int or null>,
+                                     "severity": "high" | "medium" | "low",
+                                     "message": "<explanation>",
+                                     "suggestion": "<fix, with code if useful>"}],
+                         "suggestions": [{"line": <int or null>, "message": "<improvement>"}]}"""
                     },
                     {"role": "user", "content": prompt}
                 ],
+                response_format={"type": "json_object"},
                 temperature=0.7,
                 max_tokens=2000
             )
@@ -236,42 +363,87 @@ For each issue found, provide:
 Focus on providing actionable, specific feedback that will help improve the code quality."""
 
     def _structure_ai_review(self, review: str) -> Dict:
-        """Structure the AI review response."""
-        # Extract and categorize feedback
-        issues = []
+        """Structure the AI review response returned in JSON mode."""
+        data = json.loads(review)
+        if not isinstance(data, dict):
+            raise ValueError("AI review is not a JSON object")
+        # A null list is treated as empty; any other non-list is malformed
+        issues = data.get("issues") or []
+        suggestions = data.get("suggestions") or []
+        if not isinstance(issues, list) or not isinstance(suggestions, list):
+            raise ValueError("AI review issues and suggestions must be lists")
+
+        return {
+            "issues": issues,
+            "suggestions": suggestions,
+            "review_score": self._calculate_review_score(issues)
+        }
+
+    def _calculate_review_score(self, issues: List[Dict]) -> float:
+        """Score a review from 100 down, weighting each issue by its severity."""
+        penalty = 0
+        for issue in issues:
+            severity = issue.get("severity") if isinstance(issue, dict) else None
+            penalty += _SEVERITY_WEIGHTS.get(severity, _SEVERITY_WEIGHTS["low"])
+        return float(max(0, 100 - penalty))
+
+    def _generate_suggestions(self, static_analysis: Dict, metrics: CodeMetrics) -> List[str]:
+        """Suggest follow-ups for one file from its metrics and static findings."""
+        if metrics.cyclomatic_complexity == -1:
+            return ["Fix the syntax errors so the file can be analyzed"]
+
         suggestions = []
-        current_section = None
-        
-        for line in review.split('\n'):
-            if line.strip().lower().startswith(('issue:', 'suggestion:')):
-                current_section = 'issue' if 'issue:' in line.lower() else 'suggestion'
-                issues.append(line) if current_section == 'issue' else suggestions.append(line)
-            elif line.strip() and current_section:
-                if current_section == 'issue':
-                    issues[-1] += '\n' + line
-                else:
-                    suggestions[-1] += '\n' + line
+        threshold = self.config.get('rules', {}).get('complexity_threshold', 15)
+        if metrics.cyclomatic_complexity > threshold:
+            suggestions.append(
+                f"Reduce cyclomatic complexity ({metrics.cyclomatic_complexity}, "
+                f"threshold {threshold}) by extracting smaller functions"
+            )
+        if metrics.maintainability_index < 50:
+            suggestions.append("Simplify the code to improve its maintainability index")
+        if metrics.lines_of_code > 50 and metrics.comment_ratio < 0.1:
+            suggestions.append("Document the non-obvious parts of this file")
+        high = sum(1 for issue in static_analysis.get('issues', [])
+                   if issue.get('severity') == 'high')
+        if high:
+            suggestions.append(f"Address {high} high-severity static analysis finding(s)")
+        return suggestions
 
+    def _aggregate_metrics(self, metrics: List[CodeMetrics]) -> Dict:
+        """Combine per-file metrics, skipping files that could not be analyzed."""
+        analyzed = [m for m in metrics if m.cyclomatic_complexity != -1]
+        aggregate = {
+            "files_analyzed": len(analyzed),
+            "files_with_errors": len(metrics) - len(analyzed),
+        }
+        if analyzed:
+            count = len(analyzed)
+            aggregate.update({
+                "average_cyclomatic_complexity": round(
+                    sum(m.cyclomatic_complexity for m in analyzed) / count, 2),
+                "average_maintainability_index": round(
+                    sum(m.maintainability_index for m in analyzed) / count, 2),
+                "average_cognitive_complexity": round(
+                    sum(m.cognitive_complexity for m in analyzed) / count, 2),
+                "total_lines_of_code": sum(m.lines_of_code for m in analyzed),
+            })
+        return aggregate
+
+    def _generate_review_summary(self, reviews: List[Dict]) -> Dict:
+        """Summarize findings across all reviewed files."""
+        static_issues = [issue for review in reviews
+                         for issue in review["static_analysis"].get("issues", [])]
+        ai_reviews = [review["ai_review"] for review in reviews]
+        scores = [ai["review_score"] for ai in ai_reviews if "review_score" in ai]
         return {
-            "issues": [self._parse_issue(issue) for issue in issues],
-            "suggestions": [self._parse_suggestion(sugg) for sugg in suggestions],
-            "review_score": self._calculate_review_score(issues, suggestions)
+            "static_issues": len(static_issues),
+            "high_severity_static_issues": sum(1 for issue in static_issues
+                                               if issue.get("severity") == "high"),
+            "ai_issues": sum(len(ai.get("issues", [])) for ai in ai_reviews),
+            "failed_ai_reviews": sum(1 for ai in ai_reviews if "error" in ai),
+            "average_review_score": round(sum(scores) / len(scores), 2) if scores else None,
         }
 
     def _should_ignore_file(self, file_path: str) -> bool:
         """Check if file should be ignored based on configuration."""
-        import fnmatch
-        
-        # Get patterns from config or use defaults
-        patterns = self.config.get('ignore_patterns', [
-            '*.md',
-            '*.json',
-            '*.yaml',
-            '*.lock',
-            '**/tests/*',
-            '**/migrations/*',
-            '**/node_modules/*'
-        ])
-        
-        # Check if file matches any ignore pattern
-        return any(fnmatch.fnmatch(file_path, pattern) for pattern in patterns)
\ No newline at end of file
+        return self._ignore_spec.match_file(file_path)
\ No newline at end of file
@@ -33,4 +33,16 @@ def test_load_config_custom(tmp_path):
     assert config['rules']['max_file_changes'] == 100
     assert config['rules']['complexity_threshold'] == 20
     assert config['rules']['required_tests'] is False
-    assert '*.txt' in config['ignore_patterns']
\ No newline at end of file
+    assert '*.txt' in config['ignore_patterns']
+
+def test_load_config_cached_copy_and_invalidation(tmp_path):
+    """Test cached configs are isolated copies and reload when the file changes."""
+    config_path = tmp_path / '.autoreviewerrc'
+    config_path.write_text("rules:\n  max_file_changes: 10\n")
+
+    config = load_config(str(config_path))
+    config['rules']['max_file_changes'] = 999
+    assert load_config(str(config_path))['rules']['max_file_changes'] == 10
+
+    config_path.write_text("rules:\n  max_file_changes: 2000\n")
+    assert load_config(str(config_path))['rules']['max_file_changes'] == 2000
@@ -0,0 +1,138 @@
+"""Tests for git operations."""
+
+import subprocess
+
+import pytest
+from git import InvalidGitRepositoryError
+
+from auto_reviewer.core import git as git_module
+from auto_reviewer.core.git import GitHandler, _split_diff
+
+def _git(cwd, *args):
+    """Run a git command in cwd and return its output."""
+    return subprocess.run(["git", *args], cwd=cwd, check=True,
+                          capture_output=True, text=True).stdout
+
+@pytest.fixture
+def repo_path(tmp_path, monkeypatch):
+    """Create a repository with one committed file on branch main."""
+    # Keep git from discovering a repository enclosing the temp directory
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    for var in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(var, "Test")
+    for var in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(var, "test@example.com")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "symbolic-ref", "HEAD", "refs/heads/main")
+    (tmp_path / "a.py").write_text("x = 1\n")
+    _git(tmp_path, "add", "a.py")
+    _git(tmp_path, "commit", "-q", "-m", "Add a.py")
+    return tmp_path
+
+def _diff_section(a_path, b_path, body="@@ -1 +1 @@\n-x = 1\n+x = 2"):
+    """Build one file section of a `git diff` output."""
+    return f"diff --git {a_path} {b_path}\nindex 1111111..2222222 100644\n{body}"
+
+def test_split_diff_keys_sections_by_path():
+    """Test each file's section is indexed by its path, spaces included."""
+    plain = _diff_section("a/pkg/app.py", "b/pkg/app.py")
+    spaced = _diff_section("a/my file.py", "b/my file.py")
+    sections = _split_diff(plain + "\n" + spaced)
+    assert sections == {"pkg/app.py": plain, "my file.py": spaced}
+
+def test_split_diff_skips_quoted_and_renamed_paths():
+    """Test sections whose path cannot be read from the header are left out."""
+    quoted = _diff_section('"a/caf\\303\\251.py"', '"b/caf\\303\\251.py"')
+    renamed = _diff_section("a/old.py", "b/new.py")
+    plain = _diff_section("a/app.py", "b/app.py")
+    sections = _split_diff("\n".join([quoted, renamed, plain]))
+    assert list(sections) == ["app.py"]
+    assert _split_diff("") == {}
+
+def test_get_diffs_falls_back_for_unindexed_paths(repo_path):
+    """Test a file missing from the split diff is diffed directly."""
+    (repo_path / "café.py").write_text("y = 1\n")
+    _git(repo_path, "add", "café.py")
+    _git(repo_path, "commit", "-q", "-m", "Add café.py")
+    (repo_path / "café.py").write_text("y = 2\n")
+    (repo_path / "a.py").write_text("x = 2\n")
+
+    diffs = GitHandler(str(repo_path)).get_diffs(["a.py", "café.py"])
+    assert "+x = 2" in diffs["a.py"]
+    assert "+y = 2" in diffs["café.py"]
+
+def test_diffs_pick_up_edits_between_calls(repo_path):
+    """Test a handler reports the current diff rather than a cached one."""
+    git = GitHandler(str(repo_path))
+    (repo_path / "a.py").write_text("x = 2\n")
+    assert "+x = 2" in git.get_diff_for_file("a.py")
+    assert "+x = 2" in git.get_diffs(["a.py"])["a.py"]
+
+    (repo_path / "a.py").write_text("x = 3\n")
+    assert "+x = 3" in git.get_diff_for_file("a.py")
+    assert "+x = 3" in git.get_diffs(["a.py"])["a.py"]
+
+def test_probe_reads_root_and_branch(repo_path):
+    """Test repository root, status and branch come from one probe."""
+    git = GitHandler(str(repo_path))
+    assert git.is_git_repo()
+    assert git.get_repo_root() == str(repo_path.resolve())
+    assert git.get_current_branch() == "main"
+
+def test_probe_handles_unborn_head(tmp_path, monkeypatch):
+    """Test a repository without commits still reports its root and branch."""
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "symbolic-ref", "HEAD", "refs/heads/main")
+    git = GitHandler(str(tmp_path))
+    assert git.is_git_repo()
+    assert git.get_repo_root() == str(tmp_path.resolve())
+    assert git.get_current_branch() == "main"
+
+def test_probe_outside_repository(tmp_path, monkeypatch):
+    """Test a plain directory is reported as not being a repository."""
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    git = GitHandler(str(tmp_path))
+    assert not git.is_git_repo()
+    with pytest.raises(InvalidGitRepositoryError):
+        git.get_repo_root()
+
+def test_refresh_invalidates_probe(repo_path):
+    """Test branch changes are seen only after refresh."""
+    git = GitHandler(str(repo_path))
+    assert git.get_current_branch() == "main"
+    _git(repo_path, "checkout", "-q", "-b", "feature")
+    assert git.get_current_branch() == "main"
+    git.refresh()
+    assert git.get_current_branch() == "feature"
+
+def test_pygit2_matches_gitpython(repo_path, monkeypatch):
+    """Test the pygit2 fast paths agree with the GitPython fallbacks."""
+    pytest.importorskip("pygit2")
+    (repo_path / "b.py").write_text("y = 1\n")
+    _git(repo_path, "add", "b.py")
+    _git(repo_path, "commit", "-q", "-m", "Add b.py")
+    (repo_path / "a.py").write_text("x = 2\n")
+    _git(repo_path, "commit", "-q", "-am", "Change a.py")
+    # A side change merged with `-s ours` never reaches main's a.py, so history
+    # simplification hides both it and the merge
+    _git(repo_path, "checkout", "-q", "-b", "side")
+    (repo_path / "a.py").write_text("x = 99\n")
+    _git(repo_path, "commit", "-q", "-am", "Side change")
+    _git(repo_path, "checkout", "-q", "main")
+    _git(repo_path, "merge", "-q", "-s", "ours", "side", "-m", "Merge side")
+    (repo_path / "a.py").write_text("x = 3\n")
+    (repo_path / "b.py").unlink()
+
+    fast = GitHandler(str(repo_path))
+    fast_files = fast.get_changed_files()
+    fast_history = {path: fast.get_commit_history(path) for path in ("a.py", "b.py")}
+
+    monkeypatch.setattr(git_module, "pygit2", None)
+    slow = GitHandler(str(repo_path))
+    assert fast_files == sorted(slow.get_changed_files()) == ["a.py", "b.py"]
+    for path, history in fast_history.items():
+        assert history == slow.get_commit_history(path)
+    subjects = [commit["message"].strip() for commit in fast_history["a.py"]]
+    assert subjects == ["Change a.py", "Add a.py"]
+    assert subjects == _git(repo_path, "log", "--format=%s", "--", "a.py").splitlines()
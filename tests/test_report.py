@@ -0,0 +1,98 @@
+"""Tests for report generation."""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+import pytest
+from auto_reviewer.core import report as report_module
+from auto_reviewer.core.report import ReportGenerator
+from auto_reviewer.core.static_analysis import StaticAnalyzer
+
+RESULTS = {
+    "status": "success",
+    "files_reviewed": 1,
+    "overall_metrics": {"average_complexity": 3},
+    "results": [
+        {
+            "file": "app.py",
+            "static_analysis": {
+                "issues": [{"severity": "high", "line": 3, "message": "Use of <eval>"}]
+            },
+        }
+    ],
+}
+
+def test_report_timestamp_shared_with_filename(tmp_path):
+    """Test the report header and saved filename use the same timestamp."""
+    generator = ReportGenerator(str(tmp_path))
+    timestamp = datetime(2024, 1, 2, 3, 4, 5)
+    report = generator.generate_report(RESULTS, timestamp=timestamp)
+    assert "Generated at: 2024-01-02 03:04:05" in report
+
+    path = generator.save_report(report, timestamp=timestamp)
+    assert path.name == "code_review_20240102_030405.markdown"
+    assert path.read_text() == report
+
+def test_html_report_escapes_content(tmp_path):
+    """Test HTML output renders and escapes review text."""
+    generator = ReportGenerator(str(tmp_path))
+    report = generator.generate_report(RESULTS, format="html")
+    assert "<title>Code Review Report</title>" in report
+    assert "Use of &lt;eval&gt;" in report
+    assert "<code>" in report and "</code>" in report
+
+def test_json_report_serializes_dataclasses(tmp_path):
+    """Test JSON output encodes dataclass metrics and unknown objects."""
+    @dataclass
+    class Metrics:
+        complexity: int
+
+    generator = ReportGenerator(str(tmp_path))
+    results = {"results": [{"file": "app.py", "metrics": Metrics(4), "path": tmp_path}]}
+    data = json.loads(generator.generate_report(results, format="json"))
+    assert data["results"][0]["metrics"] == {"complexity": 4}
+    assert data["results"][0]["path"] == str(tmp_path)
+
+@pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "stdlib"])
+def test_json_report_serializes_static_analysis_result(tmp_path, monkeypatch, use_orjson):
+    """Test a raw StaticAnalysisResult serializes to its plain dict form."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(report_module, "orjson", None)
+    result = StaticAnalyzer().analyze_code("import os\nos.system(cmd)\n")
+    report = ReportGenerator(str(tmp_path)).generate_report(
+        {"status": "success", "analysis": result}, format="json"
+    )
+    data = json.loads(report)["analysis"]
+    assert data == json.loads(json.dumps(result.to_dict()))
+    assert data["patterns_found"]["security"] == [[2, "Potential shell injection"]]
+    assert data["issues"][0]["severity"] == "high"
+
+def test_markdown_report_formats_structured_ai_review(tmp_path):
+    """Test JSON-mode AI issues and suggestions render as readable entries."""
+    generator = ReportGenerator(str(tmp_path))
+    results = {"results": [{
+        "file": "app.py",
+        "ai_review": {
+            "issues": [{"line": 7, "severity": "high", "message": "SQL built by concatenation",
+                        "suggestion": "Use query parameters"}],
+            "suggestions": [{"line": None, "message": "Add tests for edge cases"}],
+        },
+    }]}
+    report = generator.generate_report(results)
+    assert ("- [high] Line 7: SQL built by concatenation\n"
+            "  Suggestion: Use query parameters") in report
+    assert "- Add tests for edge cases" in report
+
+def test_save_report_recreates_removed_output_dir(tmp_path):
+    """Test saving still works if the output directory disappears."""
+    output_dir = tmp_path / "reports"
+    generator = ReportGenerator(str(output_dir))
+    output_dir.rmdir()
+
+    ReportGenerator(str(output_dir))
+    path = generator.save_report("# Report")
+    assert path.parent == output_dir
+    assert path.read_text() == "# Report"
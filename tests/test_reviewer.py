@@ -0,0 +1,136 @@
+"""Tests for code reviewer functionality."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from auto_reviewer.core import reviewer as reviewer_module
+from auto_reviewer.core.reviewer import CodeReviewer
+
+@pytest.fixture
+def reviewer(tmp_path, monkeypatch):
+    """Create a reviewer with a custom ignore list and a dummy API key."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    config_path = tmp_path / '.autoreviewerrc'
+    config_path.write_text('ignore_patterns:\n  - "*.md"\n  - "**/tests/*"\n')
+    return CodeReviewer(str(config_path))
+
+def test_should_ignore_file_gitignore_semantics(reviewer):
+    """Test ignore patterns follow gitignore rules, including top-level **/ dirs."""
+    assert reviewer._should_ignore_file('README.md')
+    assert reviewer._should_ignore_file('docs/guide.md')
+    assert reviewer._should_ignore_file('tests/test_app.py')
+    assert reviewer._should_ignore_file('pkg/tests/test_app.py')
+    assert not reviewer._should_ignore_file('pkg/app.py')
+
+def test_structure_ai_review_passes_json_items_through(reviewer):
+    """Test a JSON-mode response is split into issues, suggestions and a score."""
+    issues = [{"line": 7, "severity": "high", "message": "SQL built by concatenation",
+               "suggestion": "Use query parameters"},
+              {"line": 9, "severity": "low", "message": "Unclear name"}]
+    suggestions = [{"line": None, "message": "Add tests for edge cases"}]
+    structured = reviewer._structure_ai_review(
+        json.dumps({"issues": issues, "suggestions": suggestions})
+    )
+    assert structured == {"issues": issues, "suggestions": suggestions, "review_score": 84.0}
+    assert reviewer._structure_ai_review('{"issues": null}') == {
+        "issues": [], "suggestions": [], "review_score": 100.0
+    }
+
+def test_structure_ai_review_rejects_malformed_lists(reviewer):
+    """Test non-list issues or suggestions are reported, not passed on."""
+    with pytest.raises(ValueError):
+        reviewer._structure_ai_review('{"issues": "none found"}')
+    with pytest.raises(ValueError):
+        reviewer._structure_ai_review('[]')
+
+def test_analysis_pool_is_reused_and_not_forked(reviewer):
+    """Test multi-file analysis reuses one non-fork worker pool across reviews."""
+    files = ["a.py", "b.py"]
+    contents = ["import os\nos.system(x)\n", "def f(x):\n    return x\n"]
+    first = reviewer._analyze_files_static(files, contents)
+    pool = reviewer_module._analysis_pool
+    assert pool is not None
+    assert pool._mp_context.get_start_method() != "fork"
+
+    second = reviewer._analyze_files_static(files, contents)
+    assert reviewer_module._analysis_pool is pool
+    assert [r["file"] for r in first] == files
+    assert [r["static_analysis"] for r in second] == [r["static_analysis"] for r in first]
+
+class FakeGit:
+    """In-memory stand-in for GitHandler over a fixed set of changed files."""
+
+    def __init__(self, files):
+        self.files = files
+
+    def get_changed_files(self):
+        return list(self.files)
+
+    def get_diffs(self, file_paths):
+        return {path: f"+changed {path}" for path in file_paths}
+
+    def get_file_content(self, file_path):
+        return self.files[file_path]
+
+class FakeChatClient:
+    """Stand-in for AsyncOpenAI recording which files were sent for review."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages, **kwargs):
+        file_path = messages[-1]["content"].split("File: ", 1)[1].split("\n", 1)[0]
+        self.calls.append(file_path)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delays.get(file_path, 0))
+        self.in_flight -= 1
+        content = json.dumps({
+            "issues": [{"line": 1, "severity": "low", "message": f"Note on {file_path}"}],
+            "suggestions": []
+        })
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+CHANGED_FILES = {
+    "a.py": "import os\nos.system(cmd)\n",
+    "README.md": "# Docs\n",
+    "b.py": "def f(x):\n    return x\n",
+}
+
+def test_review_local_changes_pipeline(reviewer):
+    """Test ignored files skip the AI and results merge back in changed-file order."""
+    reviewer.git = FakeGit(CHANGED_FILES)
+    # a.py's review finishes last, so completion order differs from file order
+    reviewer.ai_client = FakeChatClient({"a.py": 0.05})
+
+    result = asyncio.run(reviewer.review_local_changes())
+
+    assert result["status"] == "success", result
+    assert sorted(reviewer.ai_client.calls) == ["a.py", "b.py"]
+    assert reviewer.ai_client.max_in_flight == 2
+    assert [review["file"] for review in result["results"]] == ["a.py", "b.py"]
+    for review in result["results"]:
+        assert review["ai_review"]["issues"][0]["message"] == f"Note on {review['file']}"
+    a_review = result["results"][0]
+    assert a_review["static_analysis"]["patterns_found"]["security"]
+    assert a_review["suggestions"] == ["Address 1 high-severity static analysis finding(s)"]
+    assert result["overall_metrics"]["files_analyzed"] == 2
+    assert result["summary"]["ai_issues"] == 2
+    assert result["summary"]["average_review_score"] == 99.0
+
+def test_review_local_changes_bounds_ai_concurrency(reviewer, monkeypatch):
+    """Test no more AI requests are in flight than the configured bound."""
+    monkeypatch.setattr(reviewer_module, "_MAX_CONCURRENT_AI_REVIEWS", 1)
+    reviewer.git = FakeGit(CHANGED_FILES)
+    reviewer.ai_client = FakeChatClient({"a.py": 0.01, "b.py": 0.01})
+
+    result = asyncio.run(reviewer.review_local_changes())
+
+    assert result["status"] == "success", result
+    assert reviewer.ai_client.max_in_flight == 1
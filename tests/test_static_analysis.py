@@ -1,12 +1,18 @@
 """Tests for static code analysis functionality."""
 
+import ast
+import pickle
+import re
+
 import pytest
 from auto_reviewer.core.static_analysis import StaticAnalyzer
 
-def test_static_analyzer_complexity():
-    """Test cyclomatic complexity calculation."""
-    analyzer = StaticAnalyzer()
-    code = """
+@pytest.fixture(scope="module")
+def analyzer():
+    """Share one analyzer across the module's tests."""
+    return StaticAnalyzer()
+
+COMPLEX_SRC = """
 def complex_function(x):
     if x > 0:
         if x < 10:
@@ -21,13 +27,8 @@ def complex_function(x):
                 break
     return False
 """
-    result = analyzer.analyze_code(code)
-    assert result.complexity > 1  # Should have high complexity due to nested conditions
 
-def test_static_analyzer_patterns():
-    """Test pattern detection."""
-    analyzer = StaticAnalyzer()
-    code = """
+PATTERNS_SRC = """
 import os
 def unsafe_function():
     user_input = input()
@@ -39,8 +40,18 @@ def unsafe_function():
     for i in range(len(data)):
         print(data[i])
 """
-    result = analyzer.analyze_code(code)
-    
+
+INVALID_SRC = """
+def invalid_function()
+    this is not valid python
+"""
+
+def _assert_complex(result):
+    """Check cyclomatic complexity calculation."""
+    assert result.complexity > 1  # Should have high complexity due to nested conditions
+
+def _assert_patterns(result):
+    """Check pattern detection."""
     # Check for security issues
     security_findings = result.patterns_found.get('security', [])
     assert len(security_findings) >= 2  # Should find os.system and exec
@@ -49,13 +60,80 @@ def unsafe_function():
     performance_findings = result.patterns_found.get('performance', [])
     assert len(performance_findings) >= 1  # Should find inefficient list iteration
 
-def test_static_analyzer_invalid_syntax():
-    """Test handling of invalid Python syntax."""
-    analyzer = StaticAnalyzer()
-    code = """
-def invalid_function()
-    this is not valid python
-"""
-    result = analyzer.analyze_code(code)
+def _assert_invalid(result):
+    """Check handling of invalid Python syntax."""
     assert result.complexity == -1  # Should indicate error
-    assert len(result.issues) > 0  # Should have syntax error issue
\ No newline at end of file
+    assert len(result.issues) > 0  # Should have syntax error issue
+    assert result.issues[0]["line"] == 2
+
+CASES = [
+    ("complexity", COMPLEX_SRC, _assert_complex),
+    ("patterns", PATTERNS_SRC, _assert_patterns),
+    ("invalid_syntax", INVALID_SRC, _assert_invalid),
+]
+
+@pytest.mark.parametrize("name,code,check", CASES, ids=[case[0] for case in CASES])
+def test_static_analyzer(analyzer, name, code, check):
+    """Test analysis of each source in the shared case matrix."""
+    check(analyzer.analyze_code(code))
+
+def test_static_analyzer_pattern_line_numbers(analyzer):
+    """Test pattern findings report the line they occur on."""
+    code = "import os\n\nos.system('ls')\nx = 1\neval('x')\n"
+    result = analyzer.analyze_code(code)
+    lines = sorted(line for line, _ in result.patterns_found['security'])
+    assert lines == [3, 5]
+
+def test_static_analyzer_caches_by_content(analyzer):
+    """Test identical sources share one cached result."""
+    code = "def f(x):\n    if x:\n        return 1\n    return 0\n"
+    first = analyzer.analyze_code(code)
+    assert analyzer.analyze_code(code) is first
+    assert analyzer.analyze_code(code + "\n") is not first
+
+def test_static_analysis_result_is_slotted_and_picklable(analyzer):
+    """Test results carry no instance dict and survive a pickle round trip."""
+    result = analyzer.analyze_code("def f(x):\n    return x and 1\n")
+    assert not hasattr(result, '__dict__')
+    assert pickle.loads(pickle.dumps(result)) == result
+
+def test_static_analyzer_analyze_tree_matches_analyze_code(analyzer):
+    """Test analyzing a pre-parsed tree gives the same result as from source."""
+    code = "import os\nfor i in range(len(xs)):\n    os.system(xs[i])\n"
+    assert analyzer.analyze_tree(ast.parse(code), code) == analyzer.analyze_code(code)
+
+def test_static_analyzer_counts_expression_branches(analyzer):
+    """Test conditional expressions and comprehension filters add complexity."""
+    code = "def f(xs):\n    return [x for x in xs if x if x > 1] if xs else []\n"
+    assert analyzer.analyze_code(code).complexity == 4
+
+def test_static_analyzer_caches_invalid_syntax(analyzer):
+    """Test invalid sources are memoized rather than re-parsed."""
+    code = "def broken(:\n    pass\n"
+    assert analyzer.analyze_code(code) is analyzer.analyze_code(code)
+
+def test_static_analysis_result_is_deeply_immutable(analyzer):
+    """Test no caller can alter the cached result handed to the next one."""
+    code = "import os\nresult = eval(user_input)\n"
+    result = analyzer.analyze_code(code)
+    expected = result.to_dict()
+    with pytest.raises(TypeError):
+        result.patterns_found['security'] = ()
+    with pytest.raises(TypeError):
+        result.issues[0]['message'] = 'tampered'
+    with pytest.raises(AttributeError):
+        result.issues.append({})
+    assert analyzer.analyze_code(code).to_dict() == expected
+    assert hash(result) == hash(analyzer.analyze_tree(ast.parse(code), code))
+
+def test_static_analyzer_pattern_edits_invalidate_cache():
+    """Test rules added to an instance apply to sources it already analyzed."""
+    analyzer = StaticAnalyzer()
+    code = "import os\ndata = items.copy()\n"
+    assert 'style' not in analyzer.analyze_code(code).patterns_found
+
+    analyzer.patterns['style'] = {'copy_call': (re.compile(r'\.copy\(\)'), 'Copy call')}
+    assert analyzer.analyze_code(code).patterns_found['style'] == ((2, 'Copy call'),)
+
+    analyzer.patterns['style']['import_os'] = (re.compile(r'import os'), 'Imports os')
+    assert len(analyzer.analyze_code(code).patterns_found['style']) == 2